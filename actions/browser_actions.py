@@ -5,19 +5,167 @@ Supports headed mode, persistent sessions, and reliable interaction.
 """
 
 import os
+import queue
+import re
+import threading
 import logging
 from typing import Optional
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from urllib.parse import quote_plus
+
+# Selenium and webdriver_manager are imported lazily inside the methods that
+# need them: they cost hundreds of ms at import time and are dead weight when
+# a session only uses system or WhatsApp actions.
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Real URLs start with an http(s) scheme; anything else becomes a search query
+_URL_RE = re.compile(r"^https?://", re.I)
+
+# Driver binary path resolved once per process and persisted across runs;
+# webdriver_manager otherwise performs HTTP version checks on every install().
+_driver_path = None
+_driver_path_lock = threading.Lock()
+_DRIVER_PATH_CACHE = os.path.join("data", "cache", "edge_driver.path")
+
+def _resolve_driver_path(refresh: bool = False) -> str:
+    """
+    Resolves the Edge driver binary path, preferring the on-disk cache from
+    a previous run. Pass refresh=True after a driver/browser version
+    mismatch to force a fresh webdriver_manager install.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if refresh:
+            _driver_path = None
+        if _driver_path is not None:
+            return _driver_path
+
+        if not refresh:
+            try:
+                with open(_DRIVER_PATH_CACHE, "r", encoding="utf-8") as fh:
+                    cached = fh.read().strip()
+                if cached and os.path.isfile(cached) and os.access(cached, os.X_OK):
+                    _driver_path = cached
+                    return _driver_path
+            except OSError:
+                pass
+
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        _driver_path = EdgeChromiumDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(_DRIVER_PATH_CACHE), exist_ok=True)
+            with open(_DRIVER_PATH_CACHE, "w", encoding="utf-8") as fh:
+                fh.write(_driver_path)
+        except OSError as e:
+            logger.debug("Could not persist driver path cache: %s", e)
+        return _driver_path
+
+class BrowserPool:
+    """
+    Pool of pre-warmed Edge drivers keyed by user_data_dir.
+    Avoids the 2-3s browser cold start on every command by reusing
+    healthy instances, retiring them after MAX_USES_PER_INSTANCE.
+    """
+
+    POOL_SIZE = 2
+    MAX_USES_PER_INSTANCE = 50
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, user_data_dir: str):
+        self.user_data_dir = user_data_dir
+        # Persistent session support; done once here instead of per launch
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        self._queue = queue.Queue(maxsize=self.POOL_SIZE)
+
+    @classmethod
+    def for_profile(cls, user_data_dir: str) -> "BrowserPool":
+        """Returns the shared pool for a profile directory, creating it once."""
+        with cls._pools_lock:
+            if user_data_dir not in cls._pools:
+                cls._pools[user_data_dir] = cls(user_data_dir)
+            return cls._pools[user_data_dir]
+
+    def _new_driver(self):
+        """Launches a fresh Edge instance in headed mode with persistent session."""
+        from selenium import webdriver
+        from selenium.webdriver.edge.service import Service as EdgeService
+
+        logger.info("Starting Edge browser...")
+        options = webdriver.EdgeOptions()
+
+        # Return from get() at DOMContentLoaded instead of full load; the
+        # element waits are the real readiness gate for interaction
+        options.page_load_strategy = "eager"
+
+        options.add_argument(f"user-data-dir={self.user_data_dir}")
+        options.add_argument("--start-maximized")
+        options.add_argument("--disable-extensions")
+        options.add_experimental_option("detach", True) # Keep browser open after script ends
+
+        from selenium.common.exceptions import SessionNotCreatedException
+
+        try:
+            service = EdgeService(_resolve_driver_path())
+            driver = webdriver.Edge(service=service, options=options)
+        except SessionNotCreatedException:
+            # Stale cached driver after a browser update: re-resolve once
+            logger.warning("Cached Edge driver rejected; re-resolving driver binary.")
+            service = EdgeService(_resolve_driver_path(refresh=True))
+            driver = webdriver.Edge(service=service, options=options)
+        logger.info("Browser started successfully.")
+        return driver
+
+    def _is_healthy(self, driver) -> bool:
+        """Checks whether a pooled driver still responds."""
+        try:
+            _ = driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """
+        Returns a (driver, uses) pair, reusing a warm instance when available.
+        """
+        while True:
+            try:
+                driver, uses = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(driver):
+                logger.debug("Reusing warm browser instance from pool.")
+                return driver, uses + 1
+            logger.warning("Discarding dead browser instance from pool.")
+            self._quit_quietly(driver)
+
+        try:
+            return self._new_driver(), 1
+        except Exception as e:
+            logger.error("Failed to start browser: %s", e)
+            raise
+
+    def release(self, driver, uses: int):
+        """Returns a driver to the pool, or retires it past its use limit."""
+        if driver is None:
+            return
+        if uses >= self.MAX_USES_PER_INSTANCE or not self._is_healthy(driver):
+            self._quit_quietly(driver)
+            return
+        try:
+            self._queue.put_nowait((driver, uses))
+        except queue.Full:
+            self._quit_quietly(driver)
+
+    @staticmethod
+    def _quit_quietly(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
 class BrowserActions:
     """
     Browser automation handler using Microsoft Edge (default on Windows).
@@ -26,69 +174,72 @@ class BrowserActions:
     def __init__(self, user_data_dir: Optional[str] = None):
         """
         Initialize the browser controller.
-        
+
         Args:
-            user_data_dir (str): Path for persistent sessions. 
+            user_data_dir (str): Path for persistent sessions.
                                 Default: 'data/cache/browser_session'
         """
         self.driver = None
         self.user_data_dir = user_data_dir or os.path.abspath("data/cache/browser_session")
         self.wait_timeout = 10
+        self._pool = BrowserPool.for_profile(self.user_data_dir)
+        self._driver_uses = 0
+        self._wait = None
 
     def _start_browser(self):
-        """Starts the Edge browser in headed mode with persistent session."""
+        """Acquires a warm Edge instance from the pool (launching if needed)."""
         if self.driver:
             return
+        self.driver, self._driver_uses = self._pool.acquire()
+        self._wait = None
 
-        logger.info("Starting Edge browser...")
-        options = webdriver.EdgeOptions()
-        
-        # Persistent session support
-        os.makedirs(self.user_data_dir, exist_ok=True)
-        options.add_argument(f"user-data-dir={self.user_data_dir}")
-        options.add_argument("--start-maximized")
-        options.add_experimental_option("detach", True) # Keep browser open after script ends
+    def _get_wait(self):
+        """Returns a cached WebDriverWait bound to the current driver."""
+        from selenium.webdriver.support.ui import WebDriverWait
 
-        try:
-            service = EdgeService(EdgeChromiumDriverManager().install())
-            self.driver = webdriver.Edge(service=service, options=options)
-            logger.info("Browser started successfully.")
-        except Exception as e:
-            logger.error(f"Failed to start browser: {e}")
-            raise
+        if self._wait is None:
+            self._wait = WebDriverWait(
+                self.driver, self.wait_timeout, poll_frequency=0.2
+            )
+        return self._wait
 
     def open_url(self, url: str) -> bool:
         """Navigates to a specific URL."""
-        if not url.startswith("http"):
-            url = f"https://www.google.com/search?q={url}" # Default to search if not URL
-            
-        logger.info(f"Navigating to: {url}")
+        if not _URL_RE.match(url):
+            url = f"https://www.google.com/search?q={quote_plus(url)}" # Default to search if not URL
+
+        logger.info("Navigating to: %s", url)
         try:
             self._start_browser()
             self.driver.get(url)
             return True
         except Exception as e:
-            logger.error(f"Navigation failed: {e}")
+            logger.error("Navigation failed: %s", e)
             return False
 
-    def click_element(self, selector: str, by: By = By.CSS_SELECTOR) -> bool:
-        """Clicks an element found by selector."""
-        logger.info(f"Clicking element: {selector}")
+    def click_element(self, selector: str, by: str = "css selector") -> bool:
+        """Clicks an element found by selector (by: a selenium By strategy)."""
+        from selenium.webdriver.support import expected_conditions as EC
+
+        logger.info("Clicking element: %s", selector)
         try:
-            element = WebDriverWait(self.driver, self.wait_timeout).until(
+            element = self._get_wait().until(
                 EC.element_to_be_clickable((by, selector))
             )
             element.click()
             return True
         except Exception as e:
-            logger.error(f"Click failed for {selector}: {e}")
+            logger.error("Click failed for %s: %s", selector, e)
             return False
 
-    def type_text(self, selector: str, text: str, submit: bool = False, by: By = By.CSS_SELECTOR) -> bool:
+    def type_text(self, selector: str, text: str, submit: bool = False, by: str = "css selector") -> bool:
         """Types text into an input field."""
-        logger.info(f"Typing into {selector}: {text[:20]}...")
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support import expected_conditions as EC
+
+        logger.info("Typing into %s: %s...", selector, text[:20])
         try:
-            element = WebDriverWait(self.driver, self.wait_timeout).until(
+            element = self._get_wait().until(
                 EC.presence_of_element_located((by, selector))
             )
             element.clear()
@@ -97,21 +248,23 @@ class BrowserActions:
                 element.send_keys(Keys.ENTER)
             return True
         except Exception as e:
-            logger.error(f"Typing failed for {selector}: {e}")
+            logger.error("Typing failed for %s: %s", selector, e)
             return False
 
     def close_browser(self):
-        """Closes the browser instance."""
+        """Releases the browser instance back to the pool."""
         if self.driver:
-            logger.info("Closing browser.")
-            self.driver.quit()
+            logger.info("Releasing browser to pool.")
+            self._pool.release(self.driver, self._driver_uses)
             self.driver = None
+            self._driver_uses = 0
+            self._wait = None
 
 if __name__ == "__main__":
     # Test script
     logging.basicConfig(level=logging.INFO)
     browser = BrowserActions()
-    
+
     print("Test: Searching Google...")
     if browser.open_url("https://www.google.com"):
         browser.type_text("textarea[name='q']", "Astra Voice Assistant GitHub", submit=True)
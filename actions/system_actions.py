@@ -8,25 +8,155 @@ Handles low-level OS automation for Windows:
 """
 
 import os
+import ctypes
 import subprocess
 import logging
-import pyautogui
-import pywinauto
 import time
 from typing import Optional
 
-# Configure PyAutoGUI safety
-pyautogui.FAILSAFE = True  # Move mouse to corner to abort
-pyautogui.PAUSE = 0.5      # Small delay between actions
+# pyautogui and pywinauto are imported lazily on first use; both are heavy
+# (screen probing, COM setup) and most sessions touch only a subset of actions.
 
 logger = logging.getLogger(__name__)
 
+# Win32 virtual-key codes for the media volume keys
+VK_VOLUME_MUTE = 0xAD
+VK_VOLUME_DOWN = 0xAE
+VK_VOLUME_UP = 0xAF
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+INPUT_KEYBOARD = 1
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+class _HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", ctypes.c_ulong),
+        ("wParamL", ctypes.c_ushort),
+        ("wParamH", ctypes.c_ushort),
+    ]
+
+class _INPUT(ctypes.Structure):
+    # All three union members must be declared even though only ki is used:
+    # the Win32 INPUT union is sized by MOUSEINPUT, and SendInput rejects
+    # the whole batch (returns 0) if cbSize doesn't match its own layout
+    class _U(ctypes.Union):
+        _fields_ = [
+            ("ki", _KEYBDINPUT),
+            ("mi", _MOUSEINPUT),
+            ("hi", _HARDWAREINPUT),
+        ]
+    _anonymous_ = ("u",)
+    _fields_ = [("type", ctypes.c_ulong), ("u", _U)]
+
+def _send_key_burst(vk: int, count: int) -> bool:
+    """
+    Sends `count` keyDown/keyUp pairs for a virtual key in one SendInput
+    call, avoiding per-press OS round-trips. Returns False off-Windows
+    so callers can fall back to pyautogui.
+    """
+    if not hasattr(ctypes, "windll"):
+        return False
+    try:
+        inputs = (_INPUT * (2 * count))()
+        for i in range(count):
+            inputs[2 * i].type = INPUT_KEYBOARD
+            inputs[2 * i].ki = _KEYBDINPUT(vk, 0, 0, 0, None)
+            inputs[2 * i + 1].type = INPUT_KEYBOARD
+            inputs[2 * i + 1].ki = _KEYBDINPUT(vk, 0, KEYEVENTF_KEYUP, 0, None)
+        sent = ctypes.windll.user32.SendInput(
+            len(inputs), inputs, ctypes.sizeof(_INPUT)
+        )
+        if sent != len(inputs):
+            # Loud on purpose: a cbSize/layout mismatch fails every call and
+            # would otherwise hide silently behind the pyautogui fallback
+            logger.warning(f"SendInput burst sent {sent}/{len(inputs)} events, "
+                           f"falling back to pyautogui")
+            return False
+        return True
+    except Exception as e:
+        logger.debug(f"SendInput burst failed, falling back to pyautogui: {e}")
+        return False
+
+def _send_unicode_text(text: str) -> bool:
+    """
+    Injects a whole string as one SendInput batch of UNICODE key events,
+    avoiding per-character injection delays. Returns False off-Windows or
+    on failure so callers can fall back to pyautogui.
+    """
+    if not hasattr(ctypes, "windll"):
+        return False
+    try:
+        # UTF-16 units so characters outside the BMP become surrogate pairs
+        units = text.encode("utf-16-le")
+        codes = [int.from_bytes(units[i:i + 2], "little") for i in range(0, len(units), 2)]
+        inputs = (_INPUT * (2 * len(codes)))()
+        for i, code in enumerate(codes):
+            inputs[2 * i].type = INPUT_KEYBOARD
+            inputs[2 * i].ki = _KEYBDINPUT(0, code, KEYEVENTF_UNICODE, 0, None)
+            inputs[2 * i + 1].type = INPUT_KEYBOARD
+            inputs[2 * i + 1].ki = _KEYBDINPUT(
+                0, code, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP, 0, None
+            )
+        sent = ctypes.windll.user32.SendInput(
+            len(inputs), inputs, ctypes.sizeof(_INPUT)
+        )
+        if sent != len(inputs):
+            # Same visibility rule as _send_key_burst: the pyautogui
+            # fallback would otherwise mask a broken batch path forever
+            logger.warning(f"Unicode SendInput sent {sent}/{len(inputs)} events, "
+                           f"falling back to pyautogui")
+            return False
+        return True
+    except Exception as e:
+        logger.debug(f"Unicode SendInput failed, falling back to pyautogui: {e}")
+        return False
+
 class SystemActions:
     """
     Deterministic automation handlers for Windows.
     No AI logic - just direct execution.
     """
 
+    def __init__(self):
+        self._pyautogui = None
+        self._pywinauto = None
+        self._desktop_session = None
+
+    def _gui(self):
+        """Lazily imports and configures pyautogui on first use."""
+        if self._pyautogui is None:
+            import pyautogui
+            pyautogui.FAILSAFE = True  # Move mouse to corner to abort
+            pyautogui.PAUSE = 0        # No implicit sleep after each call; callers
+                                       # needing animation pass duration= to moveTo
+            self._pyautogui = pyautogui
+        return self._pyautogui
+
+    def _desktop(self):
+        """Lazily imports pywinauto on first use."""
+        if self._pywinauto is None:
+            import pywinauto
+            self._pywinauto = pywinauto
+        return self._pywinauto
+
     def open_app(self, app_name: str) -> bool:
         """
         Launches an application by name or common path.
@@ -47,7 +177,13 @@ class SystemActions:
             }
             target = aliases.get(app_name.lower(), app_name)
             try:
-                subprocess.Popen(target, shell=True)
+                # No shell=True: target is a bare .exe name, so spawning
+                # cmd.exe just to parse it is pure overhead. Detach the child
+                # so no handles stay tied to the Astra process.
+                flags = (getattr(subprocess, "DETACHED_PROCESS", 0)
+                         | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0))
+                subprocess.Popen([target], shell=False, creationflags=flags,
+                                 close_fds=True)
                 return True
             except Exception as e2:
                 logger.error(f"Fallback launch failed for {target}: {e2}")
@@ -55,14 +191,44 @@ class SystemActions:
 
     def close_app(self, app_name: str) -> bool:
         """
-        Closes an application using taskkill.
+        Closes an application by process name.
+        Terminates matching processes in-process via psutil (no child
+        process spawn); falls back to taskkill if psutil is unavailable.
         """
         logger.info(f"Attempting to close: {app_name}")
+        # Note: app_name should be the process name (e.g., 'notepad.exe')
+        if not app_name.endswith(".exe"):
+            app_name += ".exe"
+
+        try:
+            import psutil
+        except ImportError:
+            return self._close_app_taskkill(app_name)
+
+        try:
+            target = app_name.lower()
+            procs = [
+                p for p in psutil.process_iter(["name"])
+                if (p.info["name"] or "").lower() == target
+            ]
+            if not procs:
+                logger.warning(f"Process {app_name} not found.")
+                return False
+
+            for p in procs:
+                p.terminate()
+            # Give processes a moment to exit cleanly, then force survivors
+            _, alive = psutil.wait_procs(procs, timeout=1)
+            for p in alive:
+                p.kill()
+            return True
+        except Exception as e:
+            logger.error(f"Error closing app {app_name}: {e}")
+            return False
+
+    def _close_app_taskkill(self, app_name: str) -> bool:
+        """Last-resort close via taskkill child process."""
         try:
-            # Force close the process by name
-            # Note: app_name should be the process name (e.g., 'notepad.exe')
-            if not app_name.endswith(".exe"):
-                app_name += ".exe"
             subprocess.run(["taskkill", "/F", "/IM", app_name], check=True, capture_output=True)
             return True
         except subprocess.CalledProcessError:
@@ -72,15 +238,29 @@ class SystemActions:
             logger.error(f"Error closing app {app_name}: {e}")
             return False
 
+    def _desktop_handle(self):
+        """
+        Returns a cached pywinauto Desktop. Building one enumerates every
+        top-level window, so it is created once; magic lookup is disabled
+        to skip attribute-resolution machinery on each access.
+        """
+        if self._desktop_session is None:
+            self._desktop_session = self._desktop().Desktop(
+                backend="uia", allow_magic_lookup=False
+            )
+        return self._desktop_session
+
     def switch_window(self, title_query: str) -> bool:
         """
         Switches focus to a window containing the title_query.
         """
         logger.info(f"Switching to window: {title_query}")
         try:
-            app = pywinauto.Desktop(backend="win32").window(title_re=f".*{title_query}.*", found_index=0)
-            if app.exists():
-                app.set_focus()
+            import re
+            pattern = f".*{re.escape(title_query)}.*"
+            matches = self._desktop_handle().windows(title_re=pattern)[:1]
+            if matches:
+                matches[0].set_focus()
                 return True
             return False
         except Exception as e:
@@ -95,13 +275,14 @@ class SystemActions:
         logger.info(f"Volume control: {action}")
         try:
             if action == "up":
-                for _ in range(amount):
-                    pyautogui.press("volumeup")
+                if not _send_key_burst(VK_VOLUME_UP, amount):
+                    self._gui().press("volumeup", presses=amount, interval=0.0)
             elif action == "down":
-                for _ in range(amount):
-                    pyautogui.press("volumedown")
+                if not _send_key_burst(VK_VOLUME_DOWN, amount):
+                    self._gui().press("volumedown", presses=amount, interval=0.0)
             elif action == "mute":
-                pyautogui.press("volumemute")
+                if not _send_key_burst(VK_VOLUME_MUTE, 1):
+                    self._gui().press("volumemute")
             return True
         except Exception as e:
             logger.error(f"Volume control failed: {e}")
@@ -113,7 +294,7 @@ class SystemActions:
         """
         logger.info(f"Executing shortcut: {keys}")
         try:
-            pyautogui.hotkey(*keys)
+            self._gui().hotkey(*keys)
             return True
         except Exception as e:
             logger.error(f"Shortcut failed: {e}")
@@ -125,7 +306,10 @@ class SystemActions:
         """
         logger.info(f"Typing text: {text[:20]}...")
         try:
-            pyautogui.write(text, interval=0.01)
+            # Short bursts aren't worth the ctypes setup cost
+            if len(text) > 8 and _send_unicode_text(text):
+                return True
+            self._gui().write(text, interval=0, _pause=False)
             return True
         except Exception as e:
             logger.error(f"Typing failed: {e}")
@@ -139,9 +323,9 @@ class SystemActions:
         logger.info(f"Mouse action: move to ({x}, {y}), click={click}")
         try:
             if x is not None and y is not None:
-                pyautogui.moveTo(x, y, duration=0.2)
+                self._gui().moveTo(x, y, duration=0.2)
             if click:
-                pyautogui.click()
+                self._gui().click()
             return True
         except Exception as e:
             logger.error(f"Mouse action failed: {e}")
@@ -7,12 +7,11 @@ Reuses BrowserActions session and logic.
 import time
 import logging
 from typing import Optional
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from actions.browser_actions import BrowserActions
 
+# Selenium is imported lazily inside methods (see browser_actions) to keep
+# startup cheap when WhatsApp automation is never used.
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -28,33 +27,60 @@ class WhatsAppActions(BrowserActions):
     MESSAGE_INPUT = 'div[contenteditable="true"][data-tab="10"]'
     SIDEBAR_LOADED = '#pane-side'
     QR_CODE = 'canvas'
+    SENT_TICK = 'span[data-icon="msg-check"], span[data-icon="msg-dblcheck"]'
+
+    # Pre-built locator tuples ("css selector" == By.CSS_SELECTOR) so hot
+    # methods don't rebuild them per call
+    _SEARCH_LOC = ("css selector", SEARCH_INPUT)
+    _MSG_LOC = ("css selector", MESSAGE_INPUT)
+    _SIDEBAR_LOC = ("css selector", SIDEBAR_LOADED)
+    _QR_LOC = ("css selector", QR_CODE)
+    _SENT_TICK_LOC = ("css selector", SENT_TICK)
 
     def wait_for_login(self, timeout: int = 60) -> bool:
         """
         Waits for WhatsApp Web to load. 
         Returns True if logged in, False if still on QR code after timeout.
         """
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         self.open_url(self.WHATSAPP_URL)
         logger.info("Waiting for WhatsApp Web to sync...")
-        
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+
+        sidebar = EC.presence_of_element_located(self._SIDEBAR_LOC)
+        qr = EC.presence_of_element_located(self._QR_LOC)
+
+        deadline = time.time() + timeout
+        qr_warned = False
+        while time.time() < deadline:
+            remaining = max(deadline - time.time(), 0.25)
             try:
-                # Check if chat list is visible
-                WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, self.SIDEBAR_LOADED))
-                )
+                # Resolve the instant either state renders instead of sleeping.
+                WebDriverWait(
+                    self.driver, remaining, poll_frequency=0.25,
+                    ignored_exceptions=(NoSuchElementException,)
+                ).until(EC.any_of(sidebar, qr))
+            except TimeoutException:
+                break
+
+            if self.driver.find_elements(*self._SIDEBAR_LOC):
+                logger.info("WhatsApp Web logged in and ready.")
+                return True
+
+            # QR still on screen; keep waiting for the scan to complete
+            if not qr_warned:
+                logger.warning("Please scan the QR code to log in.")
+                qr_warned = True
+            try:
+                WebDriverWait(self.driver, remaining, poll_frequency=0.25).until(sidebar)
                 logger.info("WhatsApp Web logged in and ready.")
                 return True
-            except:
-                # Check if QR code is still visible
-                try:
-                    self.driver.find_element(By.CSS_SELECTOR, self.QR_CODE)
-                    logger.warning("Please scan the QR code to log in.")
-                except:
-                    pass
-                time.sleep(2)
-        
+            except TimeoutException:
+                break
+
         logger.error("Login timeout reached.")
         return False
 
@@ -62,6 +88,11 @@ class WhatsAppActions(BrowserActions):
         """
         Search for a contact and send a message.
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         if not self.driver:
             self._start_browser()
             
@@ -73,31 +104,44 @@ class WhatsAppActions(BrowserActions):
             # 1. Search for contact
             logger.info(f"Searching for contact: {contact_name}")
             search_box = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.SEARCH_INPUT))
+                EC.presence_of_element_located(self._SEARCH_LOC)
             )
             search_box.clear()
             search_box.send_keys(contact_name)
-            time.sleep(2) # Wait for results
-            
-            # 2. Click the contact from results
+
+            # 2. Click the contact as soon as its row renders in the results
             contact_selector = f'span[title="{contact_name}"]'
             contact_element = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, contact_selector))
             )
             contact_element.click()
-            time.sleep(1)
-            
+
+            # Wait for the chat header to confirm the conversation is open
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, f'header span[title="{contact_name}"]')
+                )
+            )
+
             # 3. Type and send message
             logger.info(f"Sending message to {contact_name}: {message[:20]}...")
             msg_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.MESSAGE_INPUT))
+                EC.presence_of_element_located(self._MSG_LOC)
             )
-            msg_box.send_keys(message)
+            msg_box.click()
+            try:
+                # One CDP message instead of a per-character WebDriver
+                # round-trip for the whole body
+                self.driver.execute_cdp_cmd("Input.insertText", {"text": message})
+            except Exception:
+                logger.debug("CDP insertText unavailable; using send_keys.")
+                msg_box.send_keys(message)
             msg_box.send_keys(Keys.ENTER)
-            
-            # 4. Verification (Check if 'Sent' icon appears or similar)
-            # Simple check: Wait a bit to ensure enter was processed
-            time.sleep(1)
+
+            # 4. Verification: the sent/delivered tick is the real delivery signal
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located(self._SENT_TICK_LOC)
+            )
             logger.info(f"Successfully sent message to {contact_name}")
             return True
 
@@ -5,113 +5,203 @@ Ensures fail-safe execution and robust error reporting.
 """
 
 import logging
+import threading
 import traceback
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Plan shape validated by one compiled pass instead of scattered
+# isinstance/get checks; falls back to manual checks if the optional
+# fastjsonschema dependency is missing.
+_PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["steps"],
+    "properties": {
+        "steps": {
+            "type": "array",
+            "items": {"type": "object", "required": ["action"]}
+        }
+    }
+}
+
+try:
+    import fastjsonschema
+    _validate_plan_schema = fastjsonschema.compile(_PLAN_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _validate_plan_schema = None
+
 class CommandRouter:
     """
     The central distribution hub for automation.
     Hardened to handle missing sub-modules and runtime execution errors.
     """
 
+    # Flat dispatch table: action -> (handler key, method name, arg builder).
+    # Arg builders turn a step dict into (args, kwargs), so routing a step is
+    # one dict lookup plus one call instead of a conditional chain.
+    _ACTION_TABLE = {
+        "open_app": ("system", "open_app",
+                     lambda s: ((s.get("target"),), {})),
+        "close_app": ("system", "close_app",
+                      lambda s: ((s.get("target"),), {})),
+        "switch_window": ("system", "switch_window",
+                          lambda s: ((s.get("target"),), {})),
+        "type_text": ("system", "type_text",
+                      lambda s: ((s.get("value"),), {})),
+        "volume_control": ("system", "control_volume",
+                           lambda s: ((s.get("target"),),
+                                      {"amount": int(s.get("value", 1))})),
+        "search_browser": ("browser", "open_url",
+                           lambda s: ((s.get("value") or s.get("target"),), {})),
+        "whatsapp_message": ("whatsapp", "send_message",
+                             lambda s: ((s.get("target"), s.get("value")), {})),
+    }
+
+    # Handlers that share a single WebDriver must not run steps concurrently
+    _SERIALIZED_MODULES = {"browser", "whatsapp"}
+
+    MAX_WORKERS = 4
+
     def __init__(self):
         # Lazy loading of specialized handlers to save memory
         self._handlers = {}
+        self._module_locks = {m: threading.Lock() for m in self._SERIALIZED_MODULES}
 
     def execute_plan(self, plan: Any) -> List[Dict[str, Any]]:
         """
-        Sequentially executes steps and provides a robust execution report.
+        Executes steps concurrently where their dependencies allow and
+        provides a robust, index-ordered execution report.
+
+        Each step may carry a "depends_on" list of step indices; the default
+        is the previous step, preserving sequential semantics for plans that
+        don't declare dependencies. Steps whose dependency failed are
+        reported as "skipped".
         """
-        if not isinstance(plan, dict) or "steps" not in plan:
+        if _validate_plan_schema is not None:
+            try:
+                _validate_plan_schema(plan)
+            except fastjsonschema.JsonSchemaException as e:
+                logger.error("Router received invalid plan: %s", e)
+                return [{"status": "fatal_error", "message": "Invalid plan structure"}]
+        elif not isinstance(plan, dict) or "steps" not in plan:
             logger.error("Router received invalid plan.")
             return [{"status": "fatal_error", "message": "Invalid plan structure"}]
 
         steps = plan.get("steps", [])
-        report = []
+        total = len(steps)
+        report: List[Any] = [None] * total
 
-        logger.info(f"Routing {len(steps)} steps for intent: {plan.get('intent')}")
+        logger.info("Routing %d steps for intent: %s", total, plan.get("intent"))
 
+        deps = []
         for i, step in enumerate(steps):
-            action = step.get("action")
-            logger.info(f"Step {i+1}: {action}")
-
-            try:
-                success = self._dispatch(step)
-                report.append({
-                    "step": i + 1,
-                    "action": action,
-                    "status": "success" if success else "failed"
-                })
-                
-                if not success:
-                    logger.warning(f"Stop-on-failure: Step {i+1} ({action}) failed.")
+            raw = step.get("depends_on", [i - 1] if i else []) if isinstance(step, dict) else []
+            if isinstance(raw, int):
+                raw = [raw]
+            deps.append({d for d in raw if isinstance(d, int) and 0 <= d < total and d != i})
+
+        pending = set(range(total))
+        outcome: Dict[int, bool] = {}  # index -> step succeeded
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            futures = {}
+            while pending or futures:
+                # Cascade skips from failed dependencies
+                for i in sorted(pending):
+                    if any(d in outcome and not outcome[d] for d in deps[i]):
+                        pending.discard(i)
+                        outcome[i] = False
+                        report[i] = {
+                            "step": i + 1,
+                            "action": steps[i].get("action") if isinstance(steps[i], dict) else None,
+                            "status": "skipped"
+                        }
+
+                # Fire every step whose dependencies have all succeeded
+                ready = [i for i in sorted(pending)
+                         if all(d in outcome and outcome[d] for d in deps[i])]
+                for i in ready:
+                    pending.discard(i)
+                    futures[pool.submit(self._run_step, i, steps[i])] = i
+
+                if not futures:
                     break
-                    
-            except Exception as e:
-                error_trace = traceback.format_exc()
-                logger.error(f"Execution crash in step {i+1} ({action}): {e}\n{error_trace}")
-                report.append({
-                    "step": i + 1,
-                    "action": action,
-                    "status": "error",
-                    "message": str(e)
-                })
-                break
 
+                finished, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = futures.pop(future)
+                    report[i], outcome[i] = future.result()
+
+        # Any slot still empty had dependencies that could never be satisfied
+        # (e.g. a cycle); mark it in place rather than re-filtering the report
+        for i, entry in enumerate(report):
+            if entry is None:
+                report[i] = {
+                    "step": i + 1,
+                    "action": steps[i].get("action") if isinstance(steps[i], dict) else None,
+                    "status": "skipped"
+                }
         return report
 
+    def _run_step(self, index: int, step: Any) -> Tuple[Dict[str, Any], bool]:
+        """Executes one step, serializing driver-bound handlers."""
+        action = step.get("action") if isinstance(step, dict) else None
+        logger.info("Step %d: %s", index + 1, action)
+
+        rule = self._ACTION_TABLE.get(action)
+        lock = self._module_locks.get(rule[0]) if rule else None
+
+        try:
+            if lock:
+                with lock:
+                    success = self._dispatch(step)
+            else:
+                success = self._dispatch(step)
+
+            if not success:
+                logger.warning("Step %d (%s) failed.", index + 1, action)
+            return ({
+                "step": index + 1,
+                "action": action,
+                "status": "success" if success else "failed"
+            }, bool(success))
+
+        except Exception as e:
+            error_trace = traceback.format_exc()
+            logger.error("Execution crash in step %d (%s): %s\n%s", index + 1, action, e, error_trace)
+            return ({
+                "step": index + 1,
+                "action": action,
+                "status": "error",
+                "message": str(e)
+            }, False)
+
     def _dispatch(self, step: Dict) -> bool:
-        """Dynamically routes to the correct handler."""
+        """Routes a step through the precompiled action table."""
         action = step.get("action")
-        
-        # Mapping to internal handler methods
-        # This keeps the router high-level and clean
-        router_map = {
-            "open_app": ("system", "open_app"),
-            "close_app": ("system", "close_app"),
-            "switch_window": ("system", "switch_window"),
-            "type_text": ("system", "type_text"),
-            "volume_control": ("system", "control_volume"),
-            "search_browser": ("browser", "open_url"),
-            "whatsapp_message": ("whatsapp", "send_message")
-        }
 
-        if action not in router_map:
-            logger.error(f"No dispatch rule for action: {action}")
+        rule = self._ACTION_TABLE.get(action)
+        if rule is None:
+            logger.error("No dispatch rule for action: %s", action)
             return False
 
-        module_type, method_name = router_map[action]
+        module_type, method_name, build_args = rule
         handler = self._get_handler(module_type)
-        
+
         if not handler:
-            logger.error(f"Missing handler module: {module_type}")
+            logger.error("Missing handler module: %s", module_type)
             return False
 
         # Execute the method on the handler instance
         try:
-            method = getattr(handler, method_name)
-            
-            # Special handling for argument passing
-            # This would be expanded as we add more actions
-            if module_type == "system":
-                if action in ["open_app", "close_app", "switch_window"]:
-                    return method(step.get("target"))
-                elif action == "type_text":
-                    return method(step.get("value"))
-                elif action == "volume_control":
-                    return method(step.get("target"), amount=int(step.get("value", 1)))
-            
-            elif module_type == "browser":
-                return method(step.get("value") or step.get("target"))
-            
-            elif module_type == "whatsapp":
-                return method(step.get("target"), step.get("value"))
-
+            args, kwargs = build_args(step)
+            return getattr(handler, method_name)(*args, **kwargs)
         except Exception as e:
-            logger.error(f"Dispatch logic error for {action}: {e}")
+            logger.error("Dispatch logic error for %s: %s", action, e)
             return False
 
     def _get_handler(self, module_type: str) -> Any:
@@ -132,5 +222,5 @@ class CommandRouter:
             
             return self._handlers.get(module_type)
         except ImportError as e:
-            logger.error(f"Failed to import action module '{module_type}': {e}")
+            logger.error("Failed to import action module '%s': %s", module_type, e)
             return None
@@ -7,9 +7,12 @@ Ensures robustness, low CPU usage, and safe error recovery.
 import os
 import time
 import logging
+import queue
 import threading
 import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 # Import modules
@@ -28,16 +31,23 @@ except ImportError as e:
     sys.exit(1)
 
 # Configure Logging (Hardened)
+# Records go through an in-memory queue; a background listener thread does
+# the actual file/console writes so hot paths never block on stdio.
 log_dir = "logs"
 os.makedirs(log_dir, exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - [%(levelname)s] - %(name)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(log_dir, "astra_main.log"), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+
+_log_formatter = logging.Formatter('%(asctime)s - [%(levelname)s] - %(name)s - %(message)s')
+_file_handler = logging.FileHandler(os.path.join(log_dir, "astra_main.log"), encoding='utf-8')
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue, _file_handler, _stream_handler,
+                              respect_handler_level=True)
+_log_listener.start()
+
 logger = logging.getLogger("Astra")
 
 class AstraAssistant:
@@ -45,6 +55,18 @@ class AstraAssistant:
         logger.info("Initializing Astra components...")
         self.is_running = False
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        # Pool for overlapping I/O-bound stages (WAV flush, STT) with the
+        # rest of the interaction pipeline
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="astra-io")
+        # Persistent single worker for active command sessions: wakes reuse
+        # one long-lived thread (no per-wake spawn cost) and back-to-back
+        # wakes serialize instead of racing over the mic and TTS
+        self._command_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="astra-cmd")
+
+        # Resolved once so the per-command path pays no stat/abspath work
+        self._last_command_wav = os.path.abspath(os.path.join("data", "cache", "last_command.wav"))
+        os.makedirs(os.path.dirname(self._last_command_wav), exist_ok=True)
         
         try:
             # 1. Personalization & Memory
@@ -65,10 +87,36 @@ class AstraAssistant:
             self.router = CommandRouter()
             
             logger.info("All modules initialized successfully.")
+
+            # Absorb first-use costs (Vosk recognizer setup, llama weights
+            # loading into RAM, mic open) in the background while the user
+            # hears the greeting, so the first real command isn't the slow one
+            threading.Thread(target=self._warmup_cold_paths, daemon=True).start()
         except Exception as e:
             logger.critical(f"Initialization failed: {e}", exc_info=True)
             raise
 
+    def _warmup_cold_paths(self):
+        """Exercises every JIT/lazy-init path once, off the startup path."""
+        try:
+            # 0.1s of silence runs the full recognizer pipeline end to end
+            self.stt.transcribe_pcm(b"\x00\x00" * 1600)
+        except Exception as e:
+            logger.debug(f"STT warmup failed: {e}")
+        try:
+            self.brain.preload_model()
+        except Exception as e:
+            logger.debug(f"LLM warmup failed: {e}")
+        try:
+            self.listener.warm_up()
+        except Exception as e:
+            logger.debug(f"Mic warmup failed: {e}")
+        try:
+            # Pre-render the canned phrases into the TTS cache
+            self.tts.warmup()
+        except Exception as e:
+            logger.debug(f"TTS warmup failed: {e}")
+
     def startup(self):
         """Initial startup sequence."""
         try:
@@ -89,63 +137,92 @@ class AstraAssistant:
         signal.signal(signal.SIGTERM, self._signal_handler)
         
         logger.info("Entering main operational loop.")
-        
+
+        # The detector runs in its own thread and signals wakes via an
+        # event, so the main thread burns zero CPU while idle
+        detector_thread = threading.Thread(target=self._detector_loop, daemon=True)
+        detector_thread.start()
+
         try:
             while self.is_running and not self._stop_event.is_set():
-                logger.info("Astra is listening for wake word...")
-                
-                # The wake detector runs its own loop. 
-                # We use a non-blocking wait or specific detector logic.
-                try:
-                    self.wake_detector.start_listening(on_wake=self._on_wake_detected)
-                except Exception as e:
-                    logger.error(f"Wake detector error: {e}. Restarting detector in 5s...")
-                    time.sleep(5)
-                
-                # Small sleep to yield CPU if detector is non-blocking
-                time.sleep(0.1)
-                
+                if not self._wake_event.wait(timeout=1.0):
+                    continue  # periodic stop-flag check only
+                self._wake_event.clear()
+                self._on_wake_detected()
+
         except Exception as e:
             logger.critical(f"Unexpected loop crash: {e}", exc_info=True)
         finally:
             self.shutdown()
 
+    def _detector_loop(self):
+        """Runs the wake-word detector, restarting it on failure."""
+        while self.is_running and not self._stop_event.is_set():
+            logger.info("Astra is listening for wake word...")
+            try:
+                self.wake_detector.start_listening(on_wake=self._wake_event.set)
+            except Exception as e:
+                logger.error(f"Wake detector error: {e}. Restarting detector in 5s...")
+                time.sleep(5)
+
     def _on_wake_detected(self):
         """Callback triggered when the wake word 'Astra' is heard."""
         logger.info("Active session started via wake word.")
-        
-        # Run active processing in a separate thread to keep the detector alive/unfrozen
-        thread = threading.Thread(target=self._process_active_command, daemon=True)
-        thread.start()
+
+        # Warm STT and the LLM connection while the user is still speaking;
+        # by the time the utterance lands both are ready
+        self._io_pool.submit(self.stt.warmup)
+        self._io_pool.submit(self.brain.warmup)
+
+        # Run active processing off the main thread to keep the detector
+        # alive/unfrozen; the persistent worker avoids per-wake thread spawn
+        self._command_pool.submit(self._process_active_command)
 
     def _process_active_command(self):
         """Handles the recording -> AI -> Action pipeline."""
         try:
-            # 1. Acknowledge (Immediate feedback)
-            self.tts.speak("Listening.", block=True)
-            
-            # 2. Capture Audio (With timeout protection)
-            audio_path = os.path.abspath("data/cache/last_command.wav")
-            os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-            
-            success = self.listener.start_recording(max_duration=10)
-            if not success:
+            # 1+2. Open the mic first, then acknowledge: the capture thread is
+            # submitted before the TTS prompt starts so the assistant is never
+            # deaf while "Listening." plays (output and input are separate
+            # devices). STT decodes chunks off the queue while the user is
+            # still speaking, so perceived latency is roughly
+            # max(recording, transcription) instead of their sum
+            audio_path = self._last_command_wav
+            chunk_queue = queue.Queue()
+
+            def _capture():
+                try:
+                    for chunk in self.listener.iter_chunks(max_duration=10):
+                        chunk_queue.put(chunk)
+                finally:
+                    chunk_queue.put(None)  # end-of-stream sentinel
+
+            capture_future = self._io_pool.submit(_capture)
+            self.tts.speak("Listening.", block=False)
+            user_text = self.stt.transcribe_stream(
+                iter(chunk_queue.get, None), self.listener.rate
+            )
+            capture_future.result()
+
+            if not self.listener.capture_ok:
                 logger.warning("Recording failed or timed out.")
                 return
 
-            self.listener.save_recording(audio_path)
-            
-            # 3. Speech to Text
-            user_text = self.stt.transcribe_wav(audio_path)
-            
+            # Persist the WAV off the hot path (debugging/replay aid only)
+            self._io_pool.submit(self.listener.save_recording, audio_path)
+
             if not user_text or len(user_text.strip()) < 2:
                 logger.debug("No valid speech detected.")
                 return
 
             logger.info(f"Command received: '{user_text}'")
             
-            # 4. AI Brain - Intent Understanding
-            plan = self.brain.process_text(user_text)
+            # 4. AI Brain - Intent Understanding. The streamed intent field
+            # arrives well before the steps do; acknowledge under it
+            plan = self.brain.process_text(
+                user_text,
+                on_intent=lambda intent: self.tts.speak("Working on it.", block=False)
+            )
             
             # 5. Safety Guard - Policy Check
             is_valid, reason, needs_confirm = self.guard.validate_plan(plan)
@@ -167,6 +244,11 @@ class AstraAssistant:
                 else:
                     self.tts.speak(f"Problem with {', '.join(failed)}.", block=False)
             
+            # While the status TTS plays, pre-warm the mic path for the next
+            # turn; the wake detector is already re-armed since speak() above
+            # is non-blocking
+            self._io_pool.submit(self.listener.warm_up)
+
             # Update history for context
             self.memory.update_history(user_text, "Processed.")
             self.memory.set_last_plan(plan)
@@ -190,11 +272,17 @@ class AstraAssistant:
             try:
                 self.is_running = False
                 self.wake_detector.stop()
+                self._io_pool.shutdown(wait=False)
+                self._command_pool.shutdown(wait=False)
                 self.tts.speak("Shutting down. Goodbye.", block=True)
             except Exception as e:
                 logger.error(f"Error during module shutdown: {e}")
             
             logger.info("Astra has been safely deactivated.")
+            try:
+                _log_listener.stop()
+            except Exception:
+                pass
             sys.exit(0)
 
 if __name__ == "__main__":
@@ -203,9 +291,3 @@ if __name__ == "__main__":
         astra.run()
     except Exception as e:
         print(f"FATAL: Application failed to start: {e}")
-
-
-if __name__ == "__main__":
-    # Create and run the assistant
-    astra = AstraAssistant()
-    astra.run()
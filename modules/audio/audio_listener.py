@@ -7,27 +7,122 @@ Ensures device availability checks and robust stream management.
 import pyaudio
 import wave
 import logging
+import math
 import os
+import queue
 import time
+import numpy as np
 from typing import Optional
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Optional Numba JIT kernel: zero-allocation RMS over the raw int16 view.
+# numba is not a hard dependency; the NumPy path below is the fallback.
+# This is also the template for any future per-frame DSP (DC removal,
+# AGC, HPF): an @njit kernel over the frombuffer view, compiled once at
+# init, never a Python sample loop.
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _rms_i16(arr):
+        s = 0.0
+        for i in range(arr.shape[0]):
+            s += arr[i] * arr[i]
+        return math.sqrt(s / arr.shape[0]) if arr.shape[0] else 0.0
+except ImportError:
+    _rms_i16 = None
+
+# Optional trained VAD: classifies 30ms subframes as speech far more
+# reliably than an RMS threshold, at microseconds per frame in C.
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
 class AudioListener:
     """
     Handles capturing audio from the default input device.
     Includes safeguards for device disconnection and buffer stability.
     """
 
-    def __init__(self, format=pyaudio.paInt16, channels=1, rate=16000, chunk=1024):
+    def __init__(self, format=pyaudio.paInt16, channels=1, rate=16000, chunk=1024,
+                 silence_threshold: float = 500.0, silence_duration: float = 1.2):
         self.format = format
         self.channels = channels
         self.rate = rate
         self.chunk = chunk
-        self.frames = []
+        # RMS level below which a chunk counts as silence, and how long
+        # sustained silence must last (after speech) to end the recording
+        self.silence_threshold = silence_threshold
+        self.silence_duration = silence_duration
+        # Captured PCM lives in one contiguous bytearray, reused across
+        # recordings: in-place extend beats a per-chunk list + b''.join
+        # (which walks and copies every byte again), and the buffer hands
+        # to NumPy via np.frombuffer with zero copy
+        self._pcm = bytearray()
         self._pa = None
         self._stream = None
+        self._capture_ok = False
+
+        # webrtcvad only speaks 8/16/32/48 kHz; other rates use RMS voting
+        self._vad = None
+        if webrtcvad is not None and rate in (8000, 16000, 32000, 48000):
+            self._vad = webrtcvad.Vad(2)  # moderately aggressive
+
+        # Compile the Numba kernel now (1-sample dummy) so the first real
+        # chunk doesn't pay the JIT cost mid-recording
+        if _rms_i16 is not None:
+            _rms_i16(np.zeros(1, dtype=np.int16))
+
+    # 30 ms sub-windows at 16 kHz: the frame size VAD literature settles on.
+    # Voting over these instead of whole chunks keeps one noisy dip (or one
+    # quiet dip mid-word) from flipping the silence state
+    _SUBFRAME = 480
+    _SUBFRAME_BYTES = _SUBFRAME * 2  # int16 samples
+
+    def _voiced_subframes(self, audio_data: bytes):
+        """
+        Per-30ms-subframe speech flags for a raw int16 PCM chunk: the
+        trained webrtcvad classifier when available, RMS voting otherwise.
+        """
+        if self._vad is not None:
+            n = len(audio_data) // self._SUBFRAME_BYTES
+            if n:
+                try:
+                    sf = self._SUBFRAME_BYTES
+                    return np.array(
+                        [self._vad.is_speech(audio_data[i * sf:(i + 1) * sf], self.rate)
+                         for i in range(n)],
+                        dtype=bool,
+                    )
+                except Exception as e:
+                    logger.debug("VAD failed, falling back to RMS: %s", e)
+        return self._subframe_rms(audio_data) >= self.silence_threshold
+
+    @staticmethod
+    def _subframe_rms(audio_data: bytes):
+        """Per-30ms-subframe RMS levels of a raw int16 PCM chunk."""
+        arr = np.frombuffer(audio_data, dtype='<i2')
+        usable = (arr.size // AudioListener._SUBFRAME) * AudioListener._SUBFRAME
+        if not usable:
+            return np.array([AudioListener._calculate_rms(audio_data)])
+        frames = arr[:usable].reshape(-1, AudioListener._SUBFRAME).astype(np.int32)
+        return np.sqrt((frames * frames).mean(axis=1))
+
+    @staticmethod
+    def _calculate_rms(audio_data: bytes) -> float:
+        """
+        RMS level of a raw int16 PCM chunk. Uses the Numba kernel when
+        available (no temporaries), otherwise NumPy with int64 accumulation.
+        """
+        arr = np.frombuffer(audio_data, dtype='<i2')
+        if arr.size == 0:
+            return 0.0
+        if _rms_i16 is not None:
+            return float(_rms_i16(arr))
+        return float(np.sqrt(np.dot(arr.astype(np.int64), arr) / arr.size))
 
     def _init_pyaudio(self) -> bool:
         """Initializes PyAudio only when needed."""
@@ -36,47 +131,116 @@ class AudioListener:
                 self._pa = pyaudio.PyAudio()
             return True
         except Exception as e:
-            logger.error(f"Failed to initialize PyAudio: {e}")
+            logger.error("Failed to initialize PyAudio: %s", e)
             return False
 
-    def start_recording(self, max_duration: int = 5) -> bool:
+    @property
+    def capture_ok(self) -> bool:
+        """Whether the most recent capture opened its stream successfully."""
+        return self._capture_ok
+
+    def warm_up(self) -> bool:
         """
-        Record audio for a fixed duration with safety checks.
+        Pre-initializes PyAudio ahead of the next capture (e.g. while TTS
+        is still speaking) so start_recording opens the stream instantly.
+        """
+        return self._init_pyaudio()
+
+    def iter_chunks(self, max_duration: int = 5):
         """
+        Captures audio and yields raw PCM chunks as they arrive, so a
+        consumer (e.g. streaming STT) can start decoding while the user is
+        still speaking. Chunks are also retained in self._pcm for
+        save_recording. Ends early after trailing silence follows speech.
+        """
+        self._capture_ok = False
+        del self._pcm[:]  # reuse the allocation from the previous capture
+
         if not self._init_pyaudio():
-            return False
+            return
+
+        logger.info("Starting recording (max %ss)...", max_duration)
+
+        # Callback mode: PortAudio's own I/O thread delivers chunks from C,
+        # so no Python read loop holds the GIL for the chunk duration.
+        # The bytes object PortAudio hands the callback is the one that
+        # flows through the queue to the consumer and on to Vosk's
+        # AcceptWaveform - no per-chunk re-copy anywhere on the path.
+        # Silence detection is fused into the callback: the stream completes
+        # itself on trailing silence and the consumer never sees dead chunks.
+        chunk_queue = queue.Queue()
+        # Silence is decided by a run of consecutive silent 30ms sub-windows,
+        # not per-chunk: finer resolution ends recordings earlier on real
+        # silence, and a breath pause inside one chunk can't trigger a stop
+        silence_subframes_limit = int(self.silence_duration * self.rate / self._SUBFRAME)
+        state = {"silent_run": 0, "heard_speech": False}
+
+        def _on_audio(in_data, frame_count, time_info, status):
+            loud = self._voiced_subframes(in_data)
+            if loud.any():
+                state["heard_speech"] = True
+                # run restarts at the trailing silent sub-windows, if any
+                state["silent_run"] = int(np.argmax(loud[::-1]))
+                chunk_queue.put(in_data)
+            else:
+                state["silent_run"] += len(loud)
+                # Leading silence never reaches the decoder; trailing
+                # silence is kept so Vosk can finalize the last word
+                if state["heard_speech"]:
+                    chunk_queue.put(in_data)
+                    if state["silent_run"] >= silence_subframes_limit:
+                        chunk_queue.put(None)  # end-of-capture sentinel
+                        return (None, pyaudio.paComplete)
+            return (None, pyaudio.paContinue)
 
-        logger.info(f"Starting recording (max {max_duration}s)...")
-        self.frames = []
-        
         try:
             self._stream = self._pa.open(
                 format=self.format,
                 channels=self.channels,
                 rate=self.rate,
                 input=True,
-                frames_per_buffer=self.chunk
+                frames_per_buffer=self.chunk,
+                stream_callback=_on_audio
             )
-            
-            # Calculate number of chunks
-            num_chunks = int(self.rate / self.chunk * max_duration)
-            
-            for _ in range(num_chunks):
-                if not self._stream or not self._stream.is_active():
-                    break
+            self._stream.start_stream()
+        except Exception as e:
+            logger.error("Error during audio recording: %s", e)
+            self._stop_stream()
+            return
+
+        self._capture_ok = True
+        try:
+            deadline = time.monotonic() + max_duration
+
+            while time.monotonic() < deadline:
                 try:
-                    data = self._stream.read(self.chunk, exception_on_overflow=False)
-                    self.frames.append(data)
-                except Exception as e:
-                    logger.warning(f"Audio read glitch: {e}")
+                    data = chunk_queue.get(timeout=0.25)
+                except queue.Empty:
+                    if not self._stream or not self._stream.is_active():
+                        break
+                    continue
+
+                if data is None:
+                    logger.debug("Trailing silence detected; stopping early.")
                     break
-                
+
+                self._pcm.extend(data)
+                yield data
+        finally:
             self._stop_stream()
             logger.info("Recording finished.")
-            return True
 
+    def start_recording(self, max_duration: int = 5) -> bool:
+        """
+        Record audio for a fixed duration with safety checks.
+        Blocking convenience wrapper over iter_chunks.
+        """
+        try:
+            for _ in self.iter_chunks(max_duration=max_duration):
+                pass
+            return self._capture_ok
         except Exception as e:
-            logger.error(f"Error during audio recording: {e}")
+            logger.error("Error during audio recording: %s", e)
             self._stop_stream()
             return False
 
@@ -91,11 +255,11 @@ class AudioListener:
                     pass
             self._stream = None
         except Exception as e:
-            logger.debug(f"Cleanup error: {e}")
+            logger.debug("Cleanup error: %s", e)
 
     def save_recording(self, filename: str):
         """Saves captured frames to a WAV file."""
-        if not self.frames:
+        if not self._pcm:
             logger.warning("No frames to save.")
             return
 
@@ -108,10 +272,12 @@ class AudioListener:
                     self._init_pyaudio()
                 wf.setsampwidth(self._pa.get_sample_size(self.format))
                 wf.setframerate(self.rate)
-                wf.writeframes(b''.join(self.frames))
-            logger.info(f"Audio saved to {filename}")
+                # One write of the contiguous buffer; wave fixes up the
+                # header/length on close.
+                wf.writeframesraw(self._pcm)
+            logger.info("Audio saved to %s", filename)
         except Exception as e:
-            logger.error(f"Failed to save recording: {e}")
+            logger.error("Failed to save recording: %s", e)
 
     def cleanup(self):
         """Final cleanup of PyAudio resources."""
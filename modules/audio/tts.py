@@ -5,12 +5,21 @@ Ensures non-blocking audio output and initialization safety.
 """
 
 import pyttsx3
+import hashlib
 import logging
+import os
 import threading
 import queue
 import time
 from typing import Optional
 
+# Cached playback path (Windows). Without it every phrase is synthesized
+# fresh, so the cache is simply disabled elsewhere.
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -18,55 +27,168 @@ class TTS:
     """
     Offline Text-to-Speech engine.
     Managed with a background thread queue to prevent UI/Execution freezes.
+
+    Exactly one worker thread lives for the process: speak() only enqueues,
+    so chatty dialog never spawns threads or re-creates the engine per call.
     """
 
+    # Canned phrases ("Listening.", "Success.") dominate assistant speech;
+    # re-synthesizing them every time wastes CPU. Synthesized audio is kept
+    # on disk keyed by (text, voice, rate) and replayed on later hits.
+    CACHE_DIR = os.path.join("data", "cache", "tts")
+    CACHE_MAX_ENTRIES = 64
+    # Long one-off sentences aren't worth a cache slot
+    CACHE_MAX_TEXT_LEN = 120
+
     def __init__(self, rate: int = 180, volume: float = 1.0, voice_index: int = 0):
         self.rate = rate
         self.volume = volume
         self.voice_index = voice_index
-        
+
         self.speech_queue = queue.Queue()
         self._stop_event = threading.Event()
-        
+        self._utterance_finished = threading.Event()
+
+        self._cache_dir = None
+        if winsound is not None:
+            try:
+                cache_dir = os.path.abspath(self.CACHE_DIR)
+                os.makedirs(cache_dir, exist_ok=True)
+                self._cache_dir = cache_dir
+            except OSError as e:
+                logger.warning("TTS cache disabled: %s", e)
+
         # Start background worker for speech
         self.worker_thread = threading.Thread(target=self._speech_worker, daemon=True)
         self.worker_thread.start()
         logger.info("TTS background worker started.")
 
-    def _speech_worker(self):
-        """Processes the speech queue in a separate thread to avoid blocking."""
-        engine = None
+    def _init_engine(self):
+        """Builds the engine and starts its persistent external event loop."""
         try:
             engine = pyttsx3.init()
             engine.setProperty('rate', self.rate)
             engine.setProperty('volume', self.volume)
-            
+
             voices = engine.getProperty('voices')
             if voices:
                 idx = min(self.voice_index, len(voices) - 1)
                 engine.setProperty('voice', voices[idx].id)
+
+            # Completion is event-driven: the driver reports each finished
+            # utterance and the matching queue item is marked done then
+            engine.connect('finished-utterance', self._on_utterance_done)
+            # One external loop serves every say(); no per-utterance
+            # runAndWait message-pump setup and teardown
+            engine.startLoop(False)
+            return engine
         except Exception as e:
-            logger.error(f"Failed to initialize TTS engine: {e}")
+            logger.error("Failed to initialize TTS engine: %s", e)
+            return None
+
+    def _on_utterance_done(self, name, completed):
+        """Driver callback: the current utterance finished."""
+        self._utterance_finished.set()
+
+    def _pump_until_done(self, engine):
+        """Iterates the external loop until the driver reports completion."""
+        while not self._stop_event.is_set() and not self._utterance_finished.is_set():
+            engine.iterate()
+            time.sleep(0.01)
+
+    def _cache_path(self, text: str) -> Optional[str]:
+        """Disk cache location for a phrase, or None when caching is off."""
+        if self._cache_dir is None or len(text) > self.CACHE_MAX_TEXT_LEN:
+            return None
+        key = hashlib.sha1(f"{text}|{self.voice_index}|{self.rate}".encode()).hexdigest()
+        return os.path.join(self._cache_dir, f"{key}.wav")
+
+    def _evict_cache(self):
+        """Keeps the cache directory bounded, dropping oldest-played first."""
+        try:
+            entries = [os.path.join(self._cache_dir, f)
+                       for f in os.listdir(self._cache_dir) if f.endswith(".wav")]
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:-self.CACHE_MAX_ENTRIES]:
+                os.remove(path)
+        except OSError as e:
+            logger.debug("TTS cache eviction failed: %s", e)
+
+    def _play_cached(self, path: str) -> bool:
+        """Plays a cached WAV synchronously; touches it for LRU eviction."""
+        try:
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+            os.utime(path, None)
+            return True
+        except Exception as e:
+            logger.debug("Cached playback failed, falling back to engine: %s", e)
+            return False
+
+    def _speech_worker(self):
+        """Processes the speech queue in a separate thread to avoid blocking."""
+        engine = self._init_engine()
+        if not engine:
             return
 
         while not self._stop_event.is_set():
             try:
-                # Wait for text to speak (with timeout to check stop_event)
-                text = self.speech_queue.get(timeout=1.0)
-                if text:
-                    logger.debug(f"Synthesizing speech: '{text}'")
-                    engine.say(text)
-                    engine.runAndWait()
-                self.speech_queue.task_done()
+                kind, text, cache_path, done = self.speech_queue.get(timeout=0.05)
             except queue.Empty:
+                engine.iterate()
                 continue
+
+            try:
+                try:
+                    if kind == "play" and self._play_cached(cache_path):
+                        continue
+
+                    if kind == "warm":
+                        # Render into the cache without playing anything
+                        if cache_path and not os.path.exists(cache_path):
+                            tmp_path = cache_path + ".tmp"
+                            self._utterance_finished.clear()
+                            engine.save_to_file(text, tmp_path)
+                            self._pump_until_done(engine)
+                            os.replace(tmp_path, cache_path)
+                            self._evict_cache()
+                        continue
+
+                    logger.debug("Synthesizing speech: '%s'", text)
+                    if kind == "synth" and cache_path:
+                        # Render to the cache, then play the file: the next
+                        # occurrence of this phrase skips synthesis entirely
+                        tmp_path = cache_path + ".tmp"
+                        self._utterance_finished.clear()
+                        engine.save_to_file(text, tmp_path)
+                        self._pump_until_done(engine)
+                        os.replace(tmp_path, cache_path)
+                        self._evict_cache()
+                        if self._play_cached(cache_path):
+                            continue
+
+                    self._utterance_finished.clear()
+                    engine.say(text)
+                    self._pump_until_done(engine)
+                finally:
+                    # Release the item's blocked speaker (if any) exactly
+                    # when this utterance is over, success or not
+                    if done is not None:
+                        done.set()
             except Exception as e:
-                logger.error(f"TTS Worker Error during synthesis: {e}")
+                logger.error("TTS Worker Error during synthesis: %s", e)
                 # Try to re-init engine if it crashes
                 try:
-                    engine = pyttsx3.init()
-                except:
+                    engine.endLoop()
+                except Exception:
                     pass
+                engine = self._init_engine()
+                if not engine:
+                    return
+
+        try:
+            engine.endLoop()
+        except Exception:
+            pass
 
     def speak(self, text: str, block: bool = False):
         """ 
@@ -78,10 +200,36 @@ class TTS:
         if not text:
             return
 
-        self.speech_queue.put(text)
-        
-        if block:
-            self.speech_queue.join()
+        # block waits on this utterance alone, not (like queue.join would)
+        # on everything anyone else has queued behind it
+        done = threading.Event() if block else None
+
+        cache_path = self._cache_path(text)
+        if cache_path and os.path.exists(cache_path):
+            self.speech_queue.put(("play", text, cache_path, done))
+        elif cache_path:
+            self.speech_queue.put(("synth", text, cache_path, done))
+        else:
+            self.speech_queue.put(("say", text, None, done))
+
+        if done is not None:
+            done.wait()
+
+    # Phrases every session hits; pre-rendered at warmup so even their
+    # first playback is a cache hit
+    COMMON_PHRASES = ("Listening.", "Working on it.", "Success.")
+
+    def warmup(self, phrases=None):
+        """
+        Pre-renders common phrases into the disk cache (silently) so first
+        use pays no synthesis cost. No-op when caching is unavailable.
+        """
+        if self._cache_dir is None:
+            return
+        for text in (phrases or self.COMMON_PHRASES):
+            cache_path = self._cache_path(text)
+            if cache_path and not os.path.exists(cache_path):
+                self.speech_queue.put(("warm", text, cache_path, None))
 
     def stop(self):
         """Stops the worker thread."""
@@ -91,11 +239,11 @@ class TTS:
     def set_rate(self, rate: int):
         self.rate = rate # Note: Changes will apply to next engine re-init or 
                          # we could add a dynamic parameter check in worker
-        logger.info(f"TTS target rate: {rate}")
+        logger.info("TTS target rate: %s", rate)
 
     def set_volume(self, volume: float):
         self.volume = max(0.0, min(1.0, volume))
-        logger.info(f"TTS target volume: {self.volume}")
+        logger.info("TTS target volume: %s", self.volume)
 
 if __name__ == "__main__":
     # Test script
@@ -106,18 +254,3 @@ if __name__ == "__main__":
     print("This line prints immediately while Astra speaks test two.")
     time.sleep(3)
     tts.stop()
-
-
-if __name__ == "__main__":
-    # Test script
-    logging.basicConfig(level=logging.INFO)
-    tts = TTS()
-    
-    print("Testing TTS with different rates...")
-    tts.speak("Hello, I am Astra. My system is fully operational.")
-    
-    tts.set_rate(120)
-    tts.speak("I can speak slower if you want.")
-    
-    tts.set_rate(220)
-    tts.speak("Or very fast if we are in a hurry!")
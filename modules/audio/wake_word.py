@@ -9,6 +9,13 @@ import time
 import threading
 from typing import Callable, Optional
 
+# Push-to-talk hook (optional): registers a native OS keyboard hook, so the
+# combo is delivered as an event instead of this thread polling key state.
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -16,41 +23,79 @@ class WakeWordDetector:
     """
     Simulated Wake Word Detector for Astra.
     Hardened to ensure it responds to stop signals and stays efficient.
+
+    The real detector should stay off the Python hot path: pvporcupine
+    (already in requirements) runs its keyword model in native code, so
+    the loop here should only feed it frames and dispatch on_wake —
+    never score audio in Python/NumPy itself. Hand frames to process()
+    as np.frombuffer(pcm, dtype=np.int16) views (zero copy); never
+    struct.unpack into a per-frame Python tuple. Capture should use a
+    PyAudio callback-mode stream feeding a bounded deque, with the
+    consumer slicing exact frame_length windows out of it — the same
+    design AudioListener.iter_chunks already uses — rather than
+    blocking read() calls crossing the PortAudio boundary per frame.
     """
 
-    def __init__(self, wake_word: str = "Astra"):
+    # Ignore repeat triggers (key bounce, held combo) within this window
+    WAKE_DEBOUNCE_SECONDS = 1.0
+
+    def __init__(self, wake_word: str = "Astra", ptt_hotkey: str = "ctrl+alt+a"):
         self.wake_word = wake_word
+        self.ptt_hotkey = ptt_hotkey
         self.is_listening = False
         self._stop_event = threading.Event()
+        self._hotkey_handle = None
+        self._last_wake = 0.0
 
     def start_listening(self, on_wake: Callable):
         """
         Starts the detection loop.
-        
+
         Args:
             on_wake (Callable): Function to call when wake word is detected.
         """
         self.is_listening = True
         self._stop_event.clear()
-        logger.info(f"Wake word detector started for: '{self.wake_word}'")
-        
+        logger.info("Wake word detector started for: '%s'", self.wake_word)
+
+        # Push-to-talk rides a kernel-level hook: the OS calls us on the
+        # combo, so no thread burns wakeups polling key state
+        if keyboard is not None and self._hotkey_handle is None:
+            try:
+                self._hotkey_handle = keyboard.add_hotkey(
+                    self.ptt_hotkey, lambda: self._debounced_wake(on_wake)
+                )
+                logger.info("Push-to-talk hotkey registered: %s", self.ptt_hotkey)
+            except Exception as e:
+                logger.warning("Push-to-talk hotkey unavailable: %s", e)
+
         try:
-            while not self._stop_event.is_set():
-                # Simulation: To keep CPU low, we sleep
-                time.sleep(0.5) 
-                
-                # In a real implementation, we would check the mic stream here.
-                # For this hardened shell, we just maintain the loop logic.
-                
+            # Block until stop; wake delivery is fully event-driven.
+            # (A real mic-based detector would feed Porcupine here.)
+            self._stop_event.wait()
         except Exception as e:
-            logger.error(f"Wake Word Loop Error: {e}")
+            logger.error("Wake Word Loop Error: %s", e)
         finally:
             self.stop()
 
+    def _debounced_wake(self, on_wake: Callable):
+        """Forwards a wake trigger unless one fired within the debounce window."""
+        now = time.monotonic()
+        if now - self._last_wake < self.WAKE_DEBOUNCE_SECONDS:
+            return
+        self._last_wake = now
+        on_wake()
+
     def stop(self):
         """Safely stops the detector."""
         self._stop_event.set()
         self.is_listening = False
+        if self._hotkey_handle is not None:
+            try:
+                keyboard.remove_hotkey(self._hotkey_handle)
+            except Exception:
+                pass
+            self._hotkey_handle = None
         logger.info("Wake word detector stopped.")
 
 if __name__ == "__main__":
@@ -6,42 +6,86 @@ Ensures strict whitelist adherence and destructive command blocking.
 
 import logging
 import json
-from typing import Dict, List, Tuple, Any
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional C-extension multi-pattern matcher: scans input once for every
+# destructive keyword instead of one substring search per keyword.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Policy constants as immutable module-level frozensets: nothing can mutate
+# them at runtime, and the validation loop reaches them through locals
+# instead of self -> class-dict attribute lookups.
+
+# Whitelist of allowed actions
+_ALLOWED_ACTIONS = frozenset({
+    "open_app", "close_app", "type_text", "mouse_click",
+    "search_browser", "volume_control", "brightness_control",
+    "system_shutdown", "whatsapp_message", "search_file"
+})
+
+# Whitelist of allowed applications
+_ALLOWED_APPS = frozenset({
+    "notepad", "calculator", "chrome", "msedge", "spotify",
+    "vlc", "explorer", "cmd", "powershell", "taskmgr"
+})
+
+# Targets like "google chrome" or "notepad.exe" still match, but only on
+# word boundaries - the old per-app substring scan accepted "xnotepadx"
+_ALLOWED_APPS_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, sorted(_ALLOWED_APPS))) + r")\b"
+)
+
+# Action categories; membership here only matters at import time, when
+# the dispatch table below folds them into flag bits
+_APP_SCOPED_ACTIONS = frozenset({"open_app", "close_app"})
+_CONFIRM_ACTIONS = frozenset({"system_shutdown", "whatsapp_message"})
+
+# Check categories as bit flags; new categories cost one more bit, not
+# another per-step container scan
+_APP_CHECK = 1   # target must pass the app whitelist
+_CONFIRM = 2     # step requires user confirmation before execution
+
+# Per-action dispatch table: one dict hit per step answers both "is this
+# action allowed" (missing key) and "which extra checks apply" (the flag
+# bits), so the loop never rebuilds and scans category lists.
+_ACTION_CHECKS: Dict[str, int] = {
+    action: ((_APP_CHECK if action in _APP_SCOPED_ACTIONS else 0)
+             | (_CONFIRM if action in _CONFIRM_ACTIONS else 0))
+    for action in _ALLOWED_ACTIONS
+}
+
+# Dangerous patterns
+_DESTRUCTIVE_KEYWORDS = frozenset({
+    "rm ", "del ", "format ", "erase ", "wipe ", "drop table", "reg delete", "> nul"
+})
+
 class CommandGuard:
     """
     Security gatekeeper for Astra.
     Hardened for fail-safe validation.
     """
 
-    # Whitelist of allowed actions
-    ALLOWED_ACTIONS = {
-        "open_app", "close_app", "type_text", "mouse_click", 
-        "search_browser", "volume_control", "brightness_control", 
-        "system_shutdown", "whatsapp_message", "search_file"
-    }
-
-    # Whitelist of allowed applications
-    ALLOWED_APPS = {
-        "notepad", "calculator", "chrome", "msedge", "spotify", 
-        "vlc", "explorer", "cmd", "powershell", "taskmgr"
-    }
-
-    # Dangerous patterns
-    DESTRUCTIVE_KEYWORDS = {
-        "rm ", "del ", "format ", "erase ", "wipe ", "drop table", "reg delete", "> nul"
-    }
+    # Class-level aliases kept for external callers
+    ALLOWED_ACTIONS = _ALLOWED_ACTIONS
+    ALLOWED_APPS = _ALLOWED_APPS
+    DESTRUCTIVE_KEYWORDS = _DESTRUCTIVE_KEYWORDS
 
     def validate_plan(self, plan: Any) -> Tuple[bool, str, bool]:
         """
         Validates the entire plan.
         Returns: (is_valid, reason, needs_confirmation)
         """
-        if not isinstance(plan, dict):
-            logger.error(f"Validation failed: Plan is not a dictionary. Got {type(plan)}")
+        # Exact-type test first: plans are plain dicts built from JSON, so
+        # this almost always succeeds without the subclass-aware isinstance
+        if type(plan) is not dict and not isinstance(plan, dict):
+            logger.error("Validation failed: Plan is not a dictionary. Got %s", type(plan))
             return False, "Invalid plan format.", False
 
         intent = str(plan.get("intent", "unknown")).lower()
@@ -51,46 +95,101 @@ class CommandGuard:
             logger.warning("AI Brain explicitly blocked this request.")
             return False, "AI safety filter triggered.", False
 
-        if not isinstance(steps, list):
+        if type(steps) is not list and not isinstance(steps, list):
             logger.error("Validation failed: 'steps' is not a list.")
             return False, "Invalid steps format.", False
 
         needs_confirmation = False
-
         for i, step in enumerate(steps):
-            if not isinstance(step, dict):
-                logger.error(f"Step {i} is not a dictionary.")
-                return False, f"Malformed step {i}.", False
-
-            action = step.get("action")
-            target = str(step.get("target", "")).lower()
-            value = str(step.get("value", "")).lower()
-
-            # 1. Action Whitelist
-            if action not in self.ALLOWED_ACTIONS:
-                logger.warning(f"Unauthorized action attempt: {action}")
-                return False, f"Action '{action}' is not permitted.", False
-
-            # 2. App Whitelist
-            if action in ["open_app", "close_app"]:
-                if not any(app in target for app in self.ALLOWED_APPS):
-                    logger.warning(f"Unauthorized app access: {target}")
-                    return False, f"Access to '{target}' is restricted.", False
-
-            # 3. Destructive Command Scan
-            combined = f"{target} {value}".lower()
-            for kw in self.DESTRUCTIVE_KEYWORDS:
-                if kw in combined:
-                    logger.critical(f"DESTRUCTIVE COMMAND DETECTED: {kw} in {combined}")
-                    return False, "Destructive operation blocked.", False
-
-            # 4. Confirmation Flags
-            if action in ["system_shutdown", "whatsapp_message"]:
-                needs_confirmation = True
-
-        logger.info(f"Plan validation successful: {intent}")
+            reason, sensitive = _check_step(i, step)
+            if reason:
+                return False, reason, False
+            needs_confirmation = needs_confirmation or sensitive
+
+        logger.info("Plan validation successful: %s", intent)
         return True, "Safe", needs_confirmation
 
+def _find_destructive(text: str) -> Optional[str]:
+    """First destructive keyword in text, or None. One pass when the
+    automaton is available, a single compiled-regex scan otherwise."""
+    if _DESTRUCTIVE_AC is not None:
+        hit = next(_DESTRUCTIVE_AC.iter(text), None)
+        return hit[1] if hit else None
+    m = _DESTRUCTIVE_RE.search(text)
+    return m.group(0) if m else None
+
+def _check_step(index: int, step: Any) -> Tuple[Optional[str], bool]:
+    """
+    Validates one plan step. Returns (rejection_reason, needs_confirmation);
+    reason is None for a safe step. A module-level pure function so the hot
+    loop reaches every policy constant as a plain global, not through self.
+
+    Deliberately plain Python: the work here is dict access and str
+    membership, which numba's nopython mode cannot compile, and the only
+    part with real per-byte cost - the destructive keyword scan - already
+    runs in C via the automaton/regex below.
+    """
+    # Same exact-type fast path as the plan/steps checks in validate_plan
+    if type(step) is not dict and not isinstance(step, dict):
+        logger.error("Step %d is not a dictionary.", index)
+        return f"Malformed step {index}.", False
+
+    # 1. Action Whitelist - cheapest test first: one dict lookup rejects
+    # bad steps before any string work and hands back the step's checks
+    action = step.get("action")
+    flags = _ACTION_CHECKS.get(action)
+    if flags is None:
+        logger.warning("Unauthorized action attempt: %s", action)
+        return f"Action '{action}' is not permitted.", False
+
+    # Each string is casefolded exactly once; the folded target is shared
+    # by the app check and the destructive scan below
+    raw_target = step.get("target") or ""
+    raw_value = step.get("value") or ""
+    target = str(raw_target).casefold() if raw_target else ""
+    value = str(raw_value).casefold() if raw_value else ""
+
+    # 2. App Whitelist: O(1) exact hit first, then one word-bounded
+    # C-level scan for phrase targets ("open google chrome")
+    if flags & _APP_CHECK:
+        if target not in _ALLOWED_APPS and not _ALLOWED_APPS_RE.search(target):
+            logger.warning("Unauthorized app access: %s", target)
+            return f"Access to '{target}' is restricted.", False
+
+    # 3. Destructive Command Scan - skipped when there is nothing to scan
+    if target or value:
+        combined = f"{target} {value}"
+        kw = _find_destructive(combined)
+        if kw:
+            # The dump interpolates the full combined input; skip even the
+            # %-formatting when critical records are filtered out
+            if logger.isEnabledFor(logging.CRITICAL):
+                logger.critical("DESTRUCTIVE COMMAND DETECTED: %s in %s", kw, combined)
+            return "Destructive operation blocked.", False
+
+    # 4. Confirmation Flags
+    return None, bool(flags & _CONFIRM)
+
+# Built once at import; scanning is then O(len(text)) regardless of how
+# many keywords the policy grows to. Rebuilding here is deliberate: the
+# assistant is a single process, and constructing an 8-keyword automaton
+# takes microseconds - pickling it to disk and loading it back would cost
+# more than the build it saves.
+if ahocorasick is not None:
+    _DESTRUCTIVE_AC = ahocorasick.Automaton()
+    for _kw in _DESTRUCTIVE_KEYWORDS:
+        _DESTRUCTIVE_AC.add_word(_kw, _kw)
+    _DESTRUCTIVE_AC.make_automaton()
+else:
+    _DESTRUCTIVE_AC = None
+
+# Fallback matcher: one precompiled alternation (longest-first so overlapping
+# keywords report the most specific hit), still a single C-level scan
+_DESTRUCTIVE_RE = re.compile(
+    "|".join(re.escape(k) for k in
+             sorted(_DESTRUCTIVE_KEYWORDS, key=len, reverse=True))
+)
+
 if __name__ == "__main__":
     # Test stub
     logging.basicConfig(level=logging.INFO)